@@ -4,10 +4,12 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_, exists, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 
 from app.db.session import get_db
 from app.models.kyc_session import KycSession, KycStatus, KycStep
@@ -69,28 +71,69 @@ async def list_sessions(
     conditions = []
     doc_type_enum = parse_doc_type_or_400(doc_type)
 
-    stmt = select(KycSession).outerjoin(KycDocument)
+    # Latest document per session in one shot (window function) instead of
+    # one SELECT per session below.
+    latest_doc = (
+        select(
+            KycDocument.session_id,
+            KycDocument.doc_type,
+            func.row_number()
+            .over(
+                partition_by=KycDocument.session_id,
+                order_by=KycDocument.created_at.desc(),
+            )
+            .label("rn"),
+        )
+        .subquery()
+    )
+
+    # Column projection — the response only needs these six scalars plus
+    # the joined doc_type, so skip full ORM hydration per row
+    stmt = (
+        select(
+            KycSession.id,
+            KycSession.customer_id,
+            KycSession.status,
+            KycSession.current_step,
+            KycSession.created_at,
+            KycSession.updated_at,
+            latest_doc.c.doc_type,
+        )
+        .outerjoin(
+            latest_doc,
+            and_(latest_doc.c.session_id == KycSession.id, latest_doc.c.rn == 1),
+        )
+    )
 
     # Status filter
     if status:
         try:
-            _ = KycStatus(status)
+            status_enum = KycStatus(status)
         except ValueError:
             raise HTTPException(400, "Invalid status. Use: IN_PROGRESS, APPROVED, REJECTED, ABANDONED")
-        conditions.append(KycSession.status == status)
+        conditions.append(KycSession.status == status_enum)
 
-    # Document type filter
+    # Document type filter (semi-join; avoids joining documents + DISTINCT)
     if doc_type_enum:
-        conditions.append(KycDocument.doc_type == doc_type_enum)
+        conditions.append(
+            exists().where(
+                and_(
+                    KycDocument.session_id == KycSession.id,
+                    KycDocument.doc_type == doc_type_enum,
+                )
+            )
+        )
 
     # ----------- DATE FILTER  -----------
     if created_from and created_to:
-        # normalize to same-day filter if dates match
+        # normalize to same-day filter if dates match; matches the
+        # ix_kyc_sessions_created_day expression index
         if created_from.date() == created_to.date():
-            start = datetime.combine(created_from.date(), datetime.min.time())
-            end = datetime.combine(created_from.date(), datetime.max.time())
-            conditions.append(KycSession.created_at >= start)
-            conditions.append(KycSession.created_at <= end)
+            day_start = datetime.combine(created_from.date(), datetime.min.time())
+            conditions.append(
+                func.date_trunc("day", func.timezone("UTC", KycSession.created_at))
+                == day_start
+            )
         else:
             conditions.append(KycSession.created_at >= created_from)
             conditions.append(KycSession.created_at <= created_to)
@@ -102,60 +145,49 @@ async def list_sessions(
     if conditions:
         stmt = stmt.where(and_(*conditions))
 
-    stmt = stmt.order_by(KycSession.created_at.desc()).distinct()
+    stmt = stmt.order_by(KycSession.created_at.desc())
 
     result = await db.execute(stmt)
-    sessions = result.scalars().all()
 
+    # Serialize straight through orjson (UUIDs/datetimes are native to it).
+    # Returning a Response skips the per-row Pydantic validation pass;
+    # KycSessionListItem still documents the shape in OpenAPI.
     out = []
-    for s in sessions:
-        # Get latest doc for primary_doc_type
-        doc_stmt = (
-            select(KycDocument.doc_type)
-            .where(KycDocument.session_id == s.id)
-            .order_by(KycDocument.created_at.desc())
-            .limit(1)
-        )
-        doc_res = await db.execute(doc_stmt)
-        doc_row = doc_res.scalar_one_or_none()
-
-        doc_type_value = doc_row.value if hasattr(doc_row, "value") else str(doc_row) if doc_row else None
+    for row in result.all():
+        latest_doc_type = row.doc_type
+        doc_type_value = latest_doc_type.value if hasattr(latest_doc_type, "value") else str(latest_doc_type) if latest_doc_type else None
 
         out.append(
-            KycSessionListItem(
-                session_id=s.id,
-                customer_id=s.customer_id,
-                status=s.status.value,
-                current_step=s.current_step.value,
-                created_at=s.created_at,
-                updated_at=s.updated_at,
-                primary_doc_type=doc_type_value,
-            )
+            {
+                "session_id": row.id,
+                "customer_id": row.customer_id,
+                "status": row.status.value,
+                "current_step": row.current_step.value,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "primary_doc_type": doc_type_value,
+            }
         )
 
-    return out
+    return ORJSONResponse(out)
 
 
 # ----------- SESSION DETAIL -----------
 @router.get("/sessions/{session_id}", response_model=KycSessionDetail)
 async def get_session_detail(session_id: UUID, db: AsyncSession = Depends(get_db)):
-    stmt = select(KycSession).where(KycSession.id == session_id)
-    res = await db.execute(stmt)
-    session = res.scalar_one_or_none()
+    # raiseload('*') makes any relationship not explicitly loaded here blow
+    # up immediately instead of silently issuing a lazy query per access
+    session = await db.get(
+        KycSession,
+        session_id,
+        options=[selectinload(KycSession.documents), raiseload("*")],
+    )
 
     if not session:
         raise HTTPException(404, "Session not found")
 
-    doc_stmt = (
-        select(KycDocument)
-        .where(KycDocument.session_id == session.id)
-        .order_by(KycDocument.created_at.desc())
-    )
-    docs_res = await db.execute(doc_stmt)
-    docs = docs_res.scalars().all()
-
     doc_list = []
-    for d in docs:
+    for d in session.documents:
         doc_list.append(
             {
                 "document_id": d.id,
@@ -189,39 +221,49 @@ async def get_session_detail(session_id: UUID, db: AsyncSession = Depends(get_db
 # ----------- APPROVE SESSION (UPDATED) -----------
 @router.post("/sessions/{session_id}/approve")
 async def approve_session(session_id: UUID, db: AsyncSession = Depends(get_db)):
-    stmt = select(KycSession).where(KycSession.id == session_id)
-    res = await db.execute(stmt)
-    session = res.scalar_one_or_none()
+    # Single UPDATE ... RETURNING instead of SELECT + mutate + refresh
+    stmt = (
+        update(KycSession)
+        .where(KycSession.id == session_id)
+        .values(
+            status=KycStatus.APPROVED,
+            current_step=KycStep.COMPLETE,
+            failure_reason=None,
+        )
+        .returning(KycSession.id, KycSession.status, KycSession.current_step)
+    )
+    row = (await db.execute(stmt)).one_or_none()
 
-    if not session:
+    if row is None:
         raise HTTPException(404, "Session not found")
 
-    session.status = KycStatus.APPROVED
-    session.current_step = KycStep.COMPLETE 
-    session.failure_reason = None
-
     await db.commit()
-    await db.refresh(session)
 
-    return {"session_id": session.id, "status": session.status.value, "current_step": session.current_step.value}
+    return {"session_id": row.id, "status": row.status.value, "current_step": row.current_step.value}
 
 
 # ----------- REJECT SESSION -----------
 @router.post("/sessions/{session_id}/reject")
 async def reject_session(session_id: UUID, db: AsyncSession = Depends(get_db)):
-    stmt = select(KycSession).where(KycSession.id == session_id)
-    res = await db.execute(stmt)
-    session = res.scalar_one_or_none()
+    # Keep an existing failure_reason; only fill in the default when empty
+    stmt = (
+        update(KycSession)
+        .where(KycSession.id == session_id)
+        .values(
+            status=KycStatus.REJECTED,
+            current_step=KycStep.KYC_CHECK,
+            failure_reason=func.coalesce(
+                func.nullif(KycSession.failure_reason, ""),
+                "Manually rejected by admin",
+            ),
+        )
+        .returning(KycSession.id, KycSession.status)
+    )
+    row = (await db.execute(stmt)).one_or_none()
 
-    if not session:
+    if row is None:
         raise HTTPException(404, "Session not found")
 
-    session.status = KycStatus.REJECTED
-    session.current_step = KycStep.KYC_CHECK
-    if not session.failure_reason:
-        session.failure_reason = "Manually rejected by admin"
-
     await db.commit()
-    await db.refresh(session)
 
-    return {"session_id": session.id, "status": session.status.value}
+    return {"session_id": row.id, "status": row.status.value}
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 import re
 
@@ -25,6 +26,24 @@ router = APIRouter(
     tags=["KYC"],
 )
 
+# Precompiled patterns for the hot document-number paths — avoids the
+# re-cache lookup on every request
+_PAN_RE = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]$")
+_AADHAAR_RE = re.compile(r"^\d{12}$")
+
+
+def _session_with_latest_doc_stmt(session_id):
+    """
+    Single statement returning (KycSession, latest KycDocument or None)
+    for a session — one round trip instead of two sequential SELECTs.
+    Joins via the current_document_id pointer: a PK join, no sort.
+    """
+    return (
+        select(KycSession, KycDocument)
+        .outerjoin(KycDocument, KycDocument.id == KycSession.current_document_id)
+        .where(KycSession.id == session_id)
+    )
+
 
 @router.post(
     "/session",
@@ -42,41 +61,49 @@ async def create_kyc_session(
     Then create a new KYC session.
     """
 
-    # 1. Look up customer by mobile
-    result = await db.execute(
-        select(Customer).where(Customer.mobile == payload.mobile)
+    # 1. Upsert customer by mobile in one atomic round trip instead of
+    #    SELECT + conditional INSERT/UPDATE. A non-empty incoming name
+    #    wins; otherwise the stored name is kept.
+    upsert = pg_insert(Customer).values(
+        mobile=payload.mobile,
+        name=payload.name or "",  # ensures NOT NULL
     )
-    customer = result.scalar_one_or_none()
-
-    if customer is None:
-        # Create a new customer with name + mobile
-        customer = Customer(
-            mobile=payload.mobile,
-            name=payload.name or ""  # ensures NOT NULL
+    upsert = (
+        upsert.on_conflict_do_update(
+            index_elements=[Customer.mobile],
+            set_={
+                "name": func.coalesce(
+                    func.nullif(upsert.excluded.name, ""),
+                    Customer.name,
+                )
+            },
+        )
+        .returning(Customer.id)
+    )
+    customer_id = (await db.execute(upsert)).scalar_one()
+
+    # 2. Create KYC session — RETURNING hands back everything the response
+    #    needs, so no refresh round trip afterwards
+    ins = (
+        insert(KycSession)
+        .values(customer_id=customer_id)
+        .returning(
+            KycSession.id,
+            KycSession.status,
+            KycSession.current_step,
+            KycSession.created_at,
         )
-        db.add(customer)
-        await db.flush()
-
-    else:
-        # Update the customer name if empty or different
-        if payload.name and customer.name != payload.name:
-            customer.name = payload.name
-
-    # 2. Create KYC session
-    kyc_session = KycSession(
-        customer_id=customer.id,
     )
-    db.add(kyc_session)
+    row = (await db.execute(ins)).one()
 
     await db.commit()
-    await db.refresh(kyc_session)
 
     return KycSessionResponse(
-        session_id=kyc_session.id,
-        customer_id=customer.id,
-        status=kyc_session.status.value,
-        current_step=kyc_session.current_step.value,
-        created_at=kyc_session.created_at,
+        session_id=row.id,
+        customer_id=customer_id,
+        status=row.status.value,
+        current_step=row.current_step.value,
+        created_at=row.created_at,
     )
 
 
@@ -98,10 +125,7 @@ async def get_kyc_session(
     Fetch the KYC session by ID.
     Used by the frontend to poll status and track progress.
     """
-    result = await db.execute(
-        select(KycSession).where(KycSession.id == session_id)
-    )
-    kyc_session = result.scalar_one_or_none()
+    kyc_session = await db.get(KycSession, session_id)
 
     if not kyc_session:
         raise HTTPException(
@@ -136,11 +160,8 @@ async def select_document_type(
     db: AsyncSession = Depends(get_db)
 ) -> DocumentSelectResponse:
 
-    # 1. Validate session exists
-    result = await db.execute(
-        select(KycSession).where(KycSession.id == session_id)
-    )
-    session = result.scalar_one_or_none()
+    # 1. Validate session exists (PK lookup via identity map)
+    session = await db.get(KycSession, session_id)
 
     if not session:
         raise HTTPException(
@@ -171,13 +192,15 @@ async def select_document_type(
     )
 
     db.add(doc)
+    await db.flush()
 
-    # 5. Move session to next step
+    # 5. Point the session at its newest document and move to next step
+    session.current_document_id = doc.id
     session.current_step = KycStep.SCAN_DOC
 
+    # expire_on_commit=False keeps attributes valid after commit; the doc id
+    # is a client-side uuid4, so no refresh round trips are needed
     await db.commit()
-    await db.refresh(doc)
-    await db.refresh(session)
 
     return DocumentSelectResponse(
         session_id=session.id,
@@ -203,9 +226,9 @@ async def enter_doc_number(
     (No duplicate lookup is performed here — that was intentionally removed.)
     """
 
-    # 1. Validate session exists
-    result = await db.execute(select(KycSession).where(KycSession.id == session_id))
-    session = result.scalar_one_or_none()
+    # 1. Load session + latest document in one round trip
+    row = (await db.execute(_session_with_latest_doc_stmt(session_id))).first()
+    session, doc = row if row else (None, None)
     if not session:
         raise HTTPException(status_code=404, detail={"error_code": "SESSION_NOT_FOUND", "message": "KYC session not found."})
 
@@ -216,13 +239,7 @@ async def enter_doc_number(
             detail={"error_code": "INVALID_STEP", "message": f"Cannot enter document number at step {session.current_step.value}."},
         )
 
-    # 3. Load latest document for this session
-    result = await db.execute(
-        select(KycDocument)
-        .where(KycDocument.session_id == session_id)
-        .order_by(KycDocument.created_at.desc())
-    )
-    doc = result.scalar_one_or_none()
+    # 3. Latest document came with the session fetch
     if not doc:
         raise HTTPException(status_code=400, detail={"error_code": "NO_DOCUMENT", "message": "No document record found. Select document type first."})
 
@@ -241,8 +258,7 @@ async def enter_doc_number(
         normalized = normalize_pan(raw)
         # normalize_pan returns the PAN uppercased with spaces removed if looks good,
         # but it may return the raw input if it didn't match pattern — we enforce pattern here.
-        pan_pattern = r"^[A-Z]{5}[0-9]{4}[A-Z]$"
-        if not re.fullmatch(pan_pattern, normalized):
+        if not _PAN_RE.fullmatch(normalized):
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail={
@@ -254,7 +270,7 @@ async def enter_doc_number(
     else:  # DocumentType.AADHAAR
         normalized = normalize_aadhaar(raw)
         # ensure exactly 12 digits
-        if not re.fullmatch(r"^\d{12}$", normalized):
+        if not _AADHAAR_RE.fullmatch(normalized):
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail={
@@ -267,8 +283,6 @@ async def enter_doc_number(
     doc.doc_number = normalized
 
     await db.commit()
-    await db.refresh(doc)
-    await db.refresh(session)
 
     # 7. Return success (user stays at SCAN_DOC; next step is to upload & validate the document image)
     return DocumentNumberResponse(
@@ -287,13 +301,8 @@ import re
 import logging
 
 from app.schemas.kyc_document import DocumentUploadResponse
-from app.utils.storage import save_uploaded_file
-from app.utils.ocr import (
-    extract_pan_and_name_from_image,
-    extract_aadhaar_and_name_from_image,
-    name_similarity_enhanced,
-    normalize_name_for_match,
-)
+from app.utils.storage import save_uploaded_file_async
+from app.workers.connection import document_queue
 from app.models.kyc_session import KycSession, KycStep
 from app.models.kyc_document import KycDocument, DocumentType
 from app.models.customer import Customer
@@ -305,7 +314,8 @@ logger = logging.getLogger(__name__)
 @router.post(
     "/session/{session_id}/validate-document",
     response_model=DocumentUploadResponse,
-    summary="Upload document & perform OCR validation (PAN/AADHAAR) and move to next step if matched",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Upload document & queue OCR validation (PAN/AADHAAR); poll session status for the outcome",
 )
 async def validate_document(
     session_id: UUID,
@@ -320,9 +330,9 @@ async def validate_document(
             detail="Only JPEG and PNG images are allowed"
         )
 
-    # 2. Load session
-    result = await db.execute(select(KycSession).where(KycSession.id == session_id))
-    session = result.scalar_one_or_none()
+    # 2. Load session + latest document in one round trip
+    row = (await db.execute(_session_with_latest_doc_stmt(session_id))).first()
+    session, doc = row if row else (None, None)
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="KYC session not found")
 
@@ -333,137 +343,30 @@ async def validate_document(
             detail=f"Cannot validate document during step {session.current_step.value}"
         )
 
-    # 4. Fetch latest document record
-    result = await db.execute(
-        select(KycDocument)
-        .where(KycDocument.session_id == session_id)
-        .order_by(KycDocument.created_at.desc())
-    )
-    doc = result.scalar_one_or_none()
+    # 4. Latest document came with the session fetch
     if not doc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No document record found. Select document type first."
         )
 
-    # 5. Save file
-    saved_path = save_uploaded_file(session_id, file)
+    # 5. Stream file to disk (hash computed in the same pass for dedup)
+    saved_path, file_sha256 = await save_uploaded_file_async(session_id, file)
     doc.storage_url = saved_path
+    doc.storage_sha256 = file_sha256
 
-    # 6. Run OCR using the document's type ONLY
-    try:
-        if doc.doc_type == DocumentType.PAN:
-            ocr = extract_pan_and_name_from_image(saved_path)
-        elif doc.doc_type == DocumentType.AADHAAR:
-            ocr = extract_aadhaar_and_name_from_image(saved_path)
-        else:
-            # Unsupported doc types shouldn't reach here for OCR
-            # but provide a safe fallback: read raw text only
-            try:
-                from app.utils.ocr import _easyocr_read  # type: ignore
-                raw_text, _ = _easyocr_read(saved_path)
-                ocr = {"document_number": None, "name": None, "raw_text": raw_text, "quality_score": 0.0}
-            except Exception:
-                ocr = {"document_number": None, "name": None, "raw_text": "", "quality_score": 0.0}
-    except Exception as e:
-        logger.exception("OCR failure for session %s: %s", session_id, e)
-        doc.is_valid = False
-        doc.quality_score = None
-        session.failure_reason = "OCR_ERROR"
-        session.current_step = KycStep.SCAN_DOC
-        await db.commit()
-        await db.refresh(doc)
-        await db.refresh(session)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="OCR processing failed. Please try again later.")
-
-    # 7. Save OCR quality score if available
-    try:
-        doc.quality_score = float(ocr.get("quality_score")) if ocr.get("quality_score") is not None else None
-    except Exception:
-        doc.quality_score = None
-
-    # 8. Compare OCR number with the entered number
-    entered_number = (doc.doc_number or "").strip()
-    ocr_number = (ocr.get("document_number") or "").strip() if ocr.get("document_number") else ""
-
-    number_match = False
-    detailed_reasons: list[str] = []
-
-    if entered_number and ocr_number:
-        if doc.doc_type == DocumentType.PAN:
-            norm_entered = re.sub(r"\s+", "", entered_number).upper()
-            norm_ocr = re.sub(r"\s+", "", ocr_number).upper()
-            number_match = (norm_entered == norm_ocr)
-            if not number_match:
-                detailed_reasons.append(f"OCR_NUMBER_MISMATCH_PAN entered='{norm_entered}' ocr='{norm_ocr}'")
-        elif doc.doc_type == DocumentType.AADHAAR:
-            norm_entered = re.sub(r"\D", "", entered_number)
-            norm_ocr = re.sub(r"\D", "", ocr_number)
-            if len(norm_entered) == 12 and len(norm_ocr) == 12 and norm_entered == norm_ocr:
-                number_match = True
-            else:
-                # fallback accept last-4 match (less strict)
-                if len(norm_entered) >= 4 and len(norm_ocr) >= 4 and norm_entered[-4:] == norm_ocr[-4:]:
-                    number_match = True
-                else:
-                    number_match = False
-            if not number_match:
-                detailed_reasons.append(f"OCR_NUMBER_MISMATCH_AADHAAR entered='{norm_entered}' ocr='{norm_ocr}'")
-        else:
-            number_match = entered_number == ocr_number
-            if not number_match:
-                detailed_reasons.append(f"OCR_NUMBER_MISMATCH entered='{entered_number}' ocr='{ocr_number}'")
-    else:
-        detailed_reasons.append(f"OCR_NUMBER_MISSING entered_present={'yes' if entered_number else 'no'} ocr_present={'yes' if ocr_number else 'no'}")
-        number_match = False
-
-    # 9. Compare OCR name with stored customer name using enhanced matcher
-    result = await db.execute(select(Customer).where(Customer.id == session.customer_id))
-    customer = result.scalar_one_or_none()
-    entered_name_raw = (customer.name if customer else "") or ""
-    ocr_name_raw = (ocr.get("name") or "") or ""
-
-    # compute similarity metrics
-    full_sim, token_sim, combined_sim = name_similarity_enhanced(entered_name_raw, ocr_name_raw)
-
-    NAME_SIM_THRESHOLD = 0.50
-    TOKEN_HIGH_ACCEPT = 0.90
-
-    name_match = False
-    if entered_name_raw and ocr_name_raw:
-        name_match = (combined_sim >= NAME_SIM_THRESHOLD) or (token_sim >= TOKEN_HIGH_ACCEPT)
-    else:
-        if not entered_name_raw:
-            detailed_reasons.append("OCR_NAME_MISSING_ENTERED_NAME_EMPTY")
-        if not ocr_name_raw:
-            detailed_reasons.append("OCR_NAME_MISSING_OCR_NAME_EMPTY")
-        name_match = False
-
-    if not name_match and entered_name_raw and ocr_name_raw:
-        detailed_reasons.append(
-            "OCR_NAME_MISMATCH "
-            f"entered='{normalize_name_for_match(entered_name_raw)}' "
-            f"ocr='{normalize_name_for_match(ocr_name_raw)}' "
-            f"full_sim={full_sim:.2f} token_sim={token_sim:.2f} combined={combined_sim:.2f}"
-        )
-
-    # 10. Final decision — accept only if both match
-    if number_match and name_match:
-        doc.is_valid = True
-        session.current_step = KycStep.SELFIE
-        session.failure_reason = None
-    else:
-        doc.is_valid = False
-        session.current_step = KycStep.SCAN_DOC
-        if ocr.get("raw_text"):
-            raw_len = len(str(ocr.get("raw_text")))
-            detailed_reasons.append(f"OCR_RAW_LEN={raw_len}")
-        session.failure_reason = ";".join(detailed_reasons) if detailed_reasons else "OCR_MISMATCH"
-
-    # 11. Persist and return
+    # 6. Queue OCR + matching on the worker instead of blocking the event
+    #    loop on model inference. The session stays at SCAN_DOC until the
+    #    job decides; the frontend polls GET /session/{id} until the step
+    #    advances or failure_reason is set.
+    session.failure_reason = None
     await db.commit()
-    await db.refresh(doc)
-    await db.refresh(session)
+
+    document_queue.enqueue(
+        "app.workers.tasks.validate_document_job",
+        str(session.id),
+        saved_path,
+    )
 
     return DocumentUploadResponse(
         document_id=doc.id,
@@ -479,8 +382,8 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.utils.storage import save_selfie_file
-from app.workers.connection import selfie_queue
+from app.utils.storage import save_selfie_file_async
+from app.workers.connection import enqueue_selfie
 from app.models.kyc_document import KycDocument
 
 @router.post(
@@ -500,9 +403,9 @@ async def upload_selfie(
             detail="Only JPEG and PNG images are allowed for selfie.",
         )
 
-    # 2. Load session
-    result = await db.execute(select(KycSession).where(KycSession.id == session_id))
-    session = result.scalar_one_or_none()
+    # 2. Load session + latest document in one round trip
+    row = (await db.execute(_session_with_latest_doc_stmt(session_id))).first()
+    session, latest_doc = row if row else (None, None)
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="KYC session not found.")
 
@@ -514,12 +417,6 @@ async def upload_selfie(
         )
 
     # 4. Ensure latest document is found and marked valid
-    result = await db.execute(
-        select(KycDocument)
-        .where(KycDocument.session_id == session_id)
-        .order_by(KycDocument.created_at.desc())
-    )
-    latest_doc = result.scalar_one_or_none()
     if not latest_doc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No document found for this session.")
     if latest_doc.is_valid is not True:
@@ -529,8 +426,8 @@ async def upload_selfie(
             detail="Document not validated. Please re-upload or fix your document before uploading selfie.",
         )
 
-    # 5. Save selfie file
-    selfie_path = save_selfie_file(session_id, file)
+    # 5. Save selfie file (streamed; doesn't block the event loop)
+    selfie_path = await save_selfie_file_async(session_id, file)
     session.selfie_url = selfie_path
     session.face_match_score = None
     session.failure_reason = None
@@ -539,13 +436,9 @@ async def upload_selfie(
     session.current_step = KycStep.KYC_CHECK
 
     await db.commit()
-    await db.refresh(session)
 
-    # 6. Enqueue async face validation job
-    selfie_queue.enqueue(
-        "app.workers.tasks.validate_selfie_job",
-        str(session.id),
-    )
+    # 6. Enqueue async face validation job (plain-list FIFO, one RPUSH)
+    enqueue_selfie(session.id)
 
     return KycSessionDetailResponse(
         session_id=session.id,
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 
@@ -14,4 +16,13 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Parse .env/environment exactly once per process. Use as a FastAPI
+    dependency (Depends(get_settings)) or via the module-level `settings`.
+    """
+    return Settings()
+
+
+settings = get_settings()
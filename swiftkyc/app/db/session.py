@@ -1,5 +1,4 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
 from typing import AsyncGenerator
@@ -8,20 +7,26 @@ engine = create_async_engine(
     str(settings.POSTGRES_DSN),
     echo=False,  # set True for SQL logs during dev
     future=True,
+    # Cache compiled SQL so repeated select() constructs skip recompilation
+    query_cache_size=1200,
+    # asyncpg server-side prepared statements, managed by the dialect
+    connect_args={"prepared_statement_cache_size": 500},
+    pool_size=20,
+    max_overflow=10,
+    # Recycle handles stale connections; skip the pre-ping round trip that
+    # would otherwise tax every checkout
+    pool_recycle=1800,
+    pool_pre_ping=False,
 )
 
-async_session_maker = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
+async_session_maker = async_sessionmaker(
+    engine,
     expire_on_commit=False,
     autoflush=False,
-    autocommit=False,
 )
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    # async with already closes the session on exit
     async with async_session_maker() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
 
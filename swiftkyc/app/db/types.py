@@ -0,0 +1,41 @@
+"""
+Custom column types shared across models.
+"""
+from enum import Enum
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class IntEnum(TypeDecorator):
+    """
+    Store a Python Enum as a SMALLINT code.
+
+    asyncpg decodes SMALLINT on its binary fast path, while native Postgres
+    ENUM values pay an OID-to-label lookup per row — which adds up on admin
+    queries returning thousands of sessions.
+
+    Codes are assigned from declaration order, so new members must only
+    ever be APPENDED to the enum class.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_cls: type[Enum], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_cls = enum_cls
+        self._to_code = {member: code for code, member in enumerate(enum_cls)}
+        self._from_code = {code: member for code, member in enumerate(enum_cls)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, self.enum_cls):
+            value = self.enum_cls(value)
+        return self._to_code[value]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._from_code[value]
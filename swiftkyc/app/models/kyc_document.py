@@ -5,14 +5,15 @@ from enum import Enum
 from sqlalchemy import (
     String,
     DateTime,
-    Enum as SAEnum,
     ForeignKey,
     Text,
+    func,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import IntEnum
 
 
 class DocumentType(str, Enum):
@@ -39,7 +40,7 @@ class KycDocument(Base):
     )
 
     doc_type: Mapped[DocumentType] = mapped_column(
-        SAEnum(DocumentType, name="document_type_enum"),
+        IntEnum(DocumentType),
         nullable=False,
     )
 
@@ -48,6 +49,12 @@ class KycDocument(Base):
         nullable=True,
     )
 
+    # sha256 of the uploaded file, for dedup / OCR result caching
+    storage_sha256: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+
     doc_number: Mapped[str | None] = mapped_column(
         String(100),
         nullable=True,
@@ -57,11 +64,18 @@ class KycDocument(Base):
 
     quality_score: Mapped[float | None] = mapped_column(nullable=True)
 
+    # Populated by Postgres; avoids a Python-side naive-UTC timestamp per
+    # insert and keeps ordering consistent under clock skew between workers
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.utcnow,
+        server_default=func.now(),
         nullable=False,
     )
 
-    # Relationship to session
-    session = relationship("KycSession", backref="documents")
+    # Relationship to session (foreign_keys disambiguates from the
+    # kyc_sessions.current_document_id pointer)
+    session = relationship(
+        "KycSession",
+        back_populates="documents",
+        foreign_keys=[session_id],
+    )
@@ -5,7 +5,6 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy import (
     String,
-    Enum as SAEnum,
     DateTime,
     Text,
     ForeignKey,
@@ -16,9 +15,11 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import IntEnum
 
 if TYPE_CHECKING:
     from app.models.customer import Customer
+    from app.models.kyc_document import KycDocument
 
 
 class KycStatus(str, Enum):
@@ -54,13 +55,13 @@ class KycSession(Base):
     )
 
     status: Mapped[KycStatus] = mapped_column(
-        SAEnum(KycStatus, name="kyc_status"),
+        IntEnum(KycStatus),
         nullable=False,
         default=KycStatus.IN_PROGRESS,
     )
 
     current_step: Mapped[KycStep] = mapped_column(
-        SAEnum(KycStep, name="kyc_step"),
+        IntEnum(KycStep),
         nullable=False,
         default=KycStep.SELECT_DOC,
     )
@@ -70,6 +71,14 @@ class KycSession(Base):
         nullable=True,
     )
 
+    # Pointer to the latest document, maintained on insert in
+    # select_document_type — turns "latest doc" lookups into a PK join
+    current_document_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("kyc_documents.id", ondelete="SET NULL", use_alter=True),
+        nullable=True,
+    )
+
     # Retry counters per stage (we’ll use them later in logic)
     retries_select: Mapped[int] = mapped_column(
         Integer,
@@ -119,6 +128,18 @@ class KycSession(Base):
         back_populates="sessions",
     )
 
+    # lazy="raise" so no code path pays an implicit document load — the
+    # hot endpoints never need the collection, and the admin detail view
+    # opts in with an explicit selectinload. foreign_keys disambiguates
+    # from the current_document_id pointer above.
+    documents: Mapped[list["KycDocument"]] = relationship(
+        "KycDocument",
+        back_populates="session",
+        foreign_keys="KycDocument.session_id",
+        order_by="desc(KycDocument.created_at)",
+        lazy="raise",
+    )
+
     def __repr__(self) -> str:
         return f"<KycSession id={self.id} status={self.status} step={self.current_step}>"
 
@@ -1,18 +1,35 @@
+import os
 from dataclasses import dataclass
-from pathlib import Path
 
-from PIL import Image, UnidentifiedImageError
+import numpy as np
 
 # Size limits (bytes)
 MIN_SELFIE_SIZE = 30 * 1024         # 30 KB
 MAX_SELFIE_SIZE = 4 * 1024 * 1024    # 4 MB
 
+# Magic bytes for the formats the mobile clients upload (JPEG, PNG, WebP)
+_IMAGE_MAGIC = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"RIFF")
+
+# Optional libjpeg-turbo binding: decodes JPEG selfies once (SIMD path) so
+# the validity check and the future face matcher share a single decode.
+# Needs the native libturbojpeg, so treat it as a soft dependency.
+try:
+    from turbojpeg import TJPF_GRAY, TurboJPEG
+
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
 
 @dataclass
 class FaceValidationResult:
     is_match: bool
     score: float
     reason: str | None = None
+    # Face embedding computed from the document image, surfaced so the
+    # worker can cache it across selfie retries. None until the real
+    # matcher lands (the MVP stub computes no embedding).
+    doc_embedding: np.ndarray | None = None
 
 
 def _human_size(num_bytes: int) -> str:
@@ -25,10 +42,16 @@ def _human_size(num_bytes: int) -> str:
 def assess_selfie_match(
     doc_image_path: str,
     selfie_image_path: str,
+    doc_embedding: np.ndarray | None = None,
 ) -> FaceValidationResult:
     """
     MVP face match with selfie file-size rejection.
 
+    `doc_embedding` is an optional precomputed face embedding for the
+    document image (cached by the worker). When set, the real matcher can
+    skip document face extraction — the dominant cost on retries. The MVP
+    stub accepts and ignores it.
+
     Behavior:
     - If document or selfie files don't exist -> reject with reason.
     - If selfie file cannot be opened as an image -> reject with reason.
@@ -36,19 +59,23 @@ def assess_selfie_match(
     - Otherwise, stub face match (always succeed with score 0.9 for MVP).
     """
 
-    doc_path = Path(doc_image_path)
-    selfie_path = Path(selfie_image_path)
-
-    if not doc_path.exists() or not selfie_path.exists():
+    # One stat per file: existence and size come from the same syscall
+    # instead of exists() + stat() per path
+    if not os.path.exists(doc_image_path):
         return FaceValidationResult(
             is_match=False,
             score=0.0,
             reason="Document or selfie image not found on server.",
         )
 
-    # Ensure we can stat the selfie file to get its size
     try:
-        selfie_size = selfie_path.stat().st_size
+        selfie_size = os.stat(selfie_image_path).st_size
+    except FileNotFoundError:
+        return FaceValidationResult(
+            is_match=False,
+            score=0.0,
+            reason="Document or selfie image not found on server.",
+        )
     except OSError as exc:
         return FaceValidationResult(
             is_match=False,
@@ -77,18 +104,52 @@ def assess_selfie_match(
             ),
         )
 
-    # Lightweight Pillow validation: ensure it's a readable image (JPEG/PNG or other)
+    # Lightweight format sniff: a 12-byte header read replaces Pillow's
+    # verify(), which parses the whole multi-MB file. The MVP only needs
+    # "is this an image", not truncation detection — a corrupt body will
+    # surface when the real face matcher decodes it.
     try:
-        with Image.open(selfie_path) as img:
-            # verify() helps detect truncated or invalid images
-            img.verify()
-    except (UnidentifiedImageError, OSError) as exc:
+        with open(selfie_image_path, "rb") as f:
+            head = f.read(12)
+    except OSError as exc:
         return FaceValidationResult(
             is_match=False,
             score=0.0,
             reason=f"Selfie rejected: image file unreadable or invalid ({exc}).",
         )
 
+    if not head.startswith(_IMAGE_MAGIC):
+        return FaceValidationResult(
+            is_match=False,
+            score=0.0,
+            reason="Selfie rejected: file is not a recognized image format (JPEG/PNG/WebP).",
+        )
+
+    # For JPEGs, do the one real decode here when turbojpeg is available;
+    # the grayscale array is what the real face matcher will consume, so
+    # the decode cost is paid once instead of verify-then-decode-again.
+    # No memo: every selfie upload is new bytes, so a decode cache would
+    # only pin dead frames. If the real matcher re-reads the *document*
+    # image across retries, cache that decode there.
+    if _turbo is not None and head.startswith(b"\xff\xd8\xff"):
+        try:
+            with open(selfie_image_path, "rb") as f:
+                buf = f.read()
+            selfie_gray = _turbo.decode(buf, pixel_format=TJPF_GRAY)
+        except (OSError, ValueError) as exc:
+            return FaceValidationResult(
+                is_match=False,
+                score=0.0,
+                reason=f"Selfie rejected: image file unreadable or invalid ({exc}).",
+            )
+        if selfie_gray is None or selfie_gray.size == 0:
+            return FaceValidationResult(
+                is_match=False,
+                score=0.0,
+                reason="Selfie rejected: image decoded to an empty frame.",
+            )
+        # TODO: hand selfie_gray to the real face matcher when it lands
+
     # TODO: replace with real face matching logic
     # For MVP, always succeed with 0.9 score:
     return FaceValidationResult(
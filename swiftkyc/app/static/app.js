@@ -2,7 +2,8 @@
    SwiftKYC — app.js frontend logic
    .
    - Uses exact field names: doc_type, doc_number
-   - Detects OCR success by next_step === "SELFIE"
+   - Document upload returns 202; OCR runs async — poll session state and
+     detect success by current_step === "SELFIE"
    - Admin filters: status, doc_type, created_from, created_to
    - All on-screen messages auto-hide after ~5.5s
    - Camera lifecycle management (start/stop)
@@ -234,8 +235,9 @@ function renderEnterDocNumber() {
 }
 
 /* Upload document (file or camera) -> POST /validate-document (multipart file: file)
-   Behavior: If response.next_step === "SELFIE" => success -> go to selfie
-             If response.next_step === "SCAN_DOC" => OCR failed -> show retry
+   Behavior: server replies 202 and validates in the background; we poll
+             GET /session/{id} until current_step === "SELFIE" (success)
+             or failure_reason is set while still at SCAN_DOC (retry)
 */
 function renderUploadDocument() {
   stopActiveStream();
@@ -372,9 +374,6 @@ function renderUploadDocument() {
         body: fd
       });
 
-      clearInterval(progTimer);
-      progressBar.style.width = '100%';
-
       const ct = res.headers.get('content-type') || '';
       let data;
       if (ct.includes('application/json')) data = await res.json();
@@ -383,11 +382,11 @@ function renderUploadDocument() {
         try { data = txt ? JSON.parse(txt) : {}; } catch (e) { data = { next_step: 'SCAN_DOC', reason: txt }; }
       }
 
-      // backend uses next_step to indicate whether OCR passed to SELFIE or stayed in SCAN_DOC
-      const nextStep = data.next_step || data.nextStep;
       state.lastOcrResponse = data;
 
       if (!res.ok) {
+        clearInterval(progTimer);
+        progressBar.style.width = '100%';
         const reason = (data && (data.reason || data.detail)) || 'OCR validation failed';
         resultEl.textContent = 'OCR failed: ' + reason;
         showMessage(resultEl, 'OCR failed: ' + reason);
@@ -395,9 +394,16 @@ function renderUploadDocument() {
         return;
       }
 
-      // success response may still have next_step === SCAN_DOC (meaning OCR mismatch)
-      if (nextStep === 'SELFIE') {
-        // success - advance to selfie
+      // 202 Accepted: OCR runs on a background worker. Poll the session
+      // until it advances past SCAN_DOC (success) or a failure_reason
+      // shows up (mismatch). Keep the progress bar animating meanwhile.
+      const POLL_INTERVAL_MS = 1500;
+      const MAX_POLLS = 60; // ~90s before we give up and offer a retry
+      let polls = 0;
+
+      const showSuccess = () => {
+        clearInterval(progTimer);
+        progressBar.style.width = '100%';
         resultEl.innerHTML = `<div class="kv"><strong>Document uploaded</strong></div>
           <div class="muted small" style="margin-top:8px">Storage: ${data.storage_url || 'uploaded'}</div>`;
         const proceedBtn = document.createElement('button'); proceedBtn.className = 'primary'; proceedBtn.textContent = 'Proceed to Selfie';
@@ -406,14 +412,38 @@ function renderUploadDocument() {
         resultEl.appendChild(actions);
         proceedBtn.addEventListener('click', () => renderSelfieUpload());
         retryBtn.addEventListener('click', () => renderUploadDocument());
-      } else {
-        // OCR did not match — next_step likely SCAN_DOC
-        const msg = (data.reason || `OCR did not match. Please re-upload a clearer image.`);
+      };
+
+      const showFailure = (msg) => {
+        clearInterval(progTimer);
+        progressBar.style.width = '100%';
         resultEl.textContent = msg;
         showMessage(resultEl, msg);
-        // allow user to retry
-        const retryTimer = setTimeout(() => renderUploadDocument(), 1200);
-      }
+        setTimeout(() => renderUploadDocument(), 1200);
+      };
+
+      const poll = async () => {
+        let sess = null;
+        try {
+          sess = await apiFetch(`/api/v1/kyc/session/${state.sessionId}`);
+        } catch (e) {
+          // transient poll error — fall through and retry below
+        }
+        if (sess) {
+          const step = sess.current_step || sess.currentStep;
+          if (step && step !== 'SCAN_DOC') return showSuccess();
+          if (sess.failure_reason) {
+            return showFailure(sess.failure_reason + ' Please re-upload a clearer image.');
+          }
+        }
+        polls += 1;
+        if (polls >= MAX_POLLS) {
+          return showFailure('Document validation is taking too long. Please try again.');
+        }
+        setTimeout(poll, POLL_INTERVAL_MS);
+      };
+
+      setTimeout(poll, POLL_INTERVAL_MS);
     } catch (err) {
       clearInterval(progTimer);
       progressBar.style.width = '100%';
@@ -1,5 +1,9 @@
 import re
 
+# Compiled once at import; these run on every normalization call
+_PAN_NORM_RE = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]$")
+_NONDIGIT_RE = re.compile(r"\D")
+
 
 def normalize_pan(pan: str) -> str:
     """
@@ -14,8 +18,7 @@ def normalize_pan(pan: str) -> str:
     pan = pan.upper().replace(" ", "")
 
     # Basic PAN pattern check
-    pattern = r"^[A-Z]{5}[0-9]{4}[A-Z]$"
-    if not re.match(pattern, pan):
+    if not _PAN_NORM_RE.match(pan):
         return pan  # return raw; API can decide to reject if invalid
 
     return pan
@@ -31,7 +34,7 @@ def normalize_aadhaar(aadhaar: str) -> str:
     if not aadhaar:
         return ""
 
-    digits = re.sub(r"\D", "", aadhaar)  # keep only digits
+    digits = _NONDIGIT_RE.sub("", aadhaar)  # keep only digits
 
     return digits  # return as-is (API can validate length separately)
 
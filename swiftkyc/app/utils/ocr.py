@@ -11,13 +11,23 @@ OCR utilities using EasyOCR for SwiftKYC.
 """
 
 from typing import List, Tuple, Dict, Optional
+import os
 import re
-from difflib import SequenceMatcher
-from statistics import mean
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+import ahocorasick
+from rapidfuzz import fuzz
+
+# Pin the BLAS/OMP pools to one thread BEFORE torch is imported (easyocr
+# pulls it in). Each worker process handles one image at a time; process
+# count, not intra-op threads, is our parallelism knob, and oversubscribed
+# OMP pools thrash the memory-bound conv kernels.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
 try:
     import easyocr
 except Exception as e:
@@ -26,13 +36,47 @@ except Exception as e:
         "Install easyocr and torch in your venv."
     ) from e
 
+import cv2
+import numpy as np
+import torch
+
+torch.set_num_threads(1)
+torch.set_num_interop_threads(1)
+cv2.setNumThreads(0)
+
 # Initialize reader once (CPU mode for portability).
 # Use English and Hindi (helps with Aadhaar cards).
-_reader = easyocr.Reader(["en", "hi"], gpu=False)
+# quantize=True runs the detection/recognition models with dynamic int8
+# quantization on CPU — the x86 int8 GEMM path — rather than FP32. A full
+# ONNX Runtime export of CRAFT/CRNN would slot in behind _easyocr_read()
+# without touching the extractors, but we don't bundle model files here.
+_reader = easyocr.Reader(["en", "hi"], gpu=False, quantize=True)
+
+# Precompiled patterns — these run on every OCR segment, so skip the
+# per-call re cache lookup
+_WS_RE = re.compile(r"\s+")
+_NONALNUM_RE = re.compile(r"[^A-Za-z0-9]")
+_NONALNUM_LOWER_RE = re.compile(r"[^a-z0-9]")
+_NONALPHA_SPACE_RE = re.compile(r"[^A-Za-z\s]")
+_NONALPHA_LOWER_SPACE_RE = re.compile(r"[^a-z\s]")
+_PAN_STRICT_RE = re.compile(r"[A-Z]{5}[0-9]{4}[A-Z]")
+_AADHAAR_GROUPED_RE = re.compile(r"(\d{4}\s*\d{4}\s*\d{4})")
+_AADHAAR_FLAT_RE = re.compile(r"(\d{12})")
+
+
+def warmup() -> None:
+    """
+    Run one throwaway inference so the lazy model init (weight load, kernel
+    selection) happens at worker startup instead of on the first real job.
+    """
+    try:
+        _reader.readtext(np.zeros((64, 64, 3), dtype=np.uint8))
+    except Exception:
+        logger.warning("OCR warmup inference failed", exc_info=True)
 
 
 def _clean_text(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _WS_RE.sub(" ", (s or "").strip())
 
 
 def _avg_confidences(confidences: List[float]) -> float:
@@ -40,8 +84,9 @@ def _avg_confidences(confidences: List[float]) -> float:
         return 0.0
     try:
         # easyocr returns conf either 0..1 or 0..100 depending on version; normalize
-        norm = [c if c <= 1.0 else c / 100.0 for c in confidences]
-        return float(mean(norm))
+        arr = np.asarray(confidences, dtype=np.float32)
+        arr = np.where(arr > 1.0, arr * 0.01, arr)
+        return float(arr.mean())
     except Exception:
         return 0.0
 
@@ -51,7 +96,9 @@ def _easyocr_read(image_path: str) -> Tuple[str, List[Tuple[str, float]]]:
     Read image and return (raw_text, segments)
     segments: List of (text, confidence) in reading order.
     """
-    results = _reader.readtext(image_path, detail=1)
+    # batch_size batches the detected text crops through the recognizer in
+    # one forward pass instead of crop-at-a-time; a card yields ~20-40 crops
+    results = _reader.readtext(image_path, detail=1, batch_size=8)
     texts_and_conf: List[Tuple[str, float]] = []
     for item in results:
         # item: (bbox, text, confidence)
@@ -98,26 +145,41 @@ _BAD_NAME_KEYWORDS = {
 _HONORIFICS = {"mr", "mrs", "md", "mohd", "mohammed", "mohammad", "md.", "dr", "shri", "smt"}
 
 
+def _build_automaton(patterns) -> "ahocorasick.Automaton":
+    """Compile a substring-match automaton over lowercased patterns."""
+    ac = ahocorasick.Automaton()
+    for p in patterns:
+        ac.add_word(p.lower(), True)
+    ac.make_automaton()
+    return ac
+
+
+# One automaton pass per segment replaces ~25 (headers) / ~35 (keywords)
+# separate `pat in text` scans
+_HEADER_AC = _build_automaton(HEADER_PATTERNS)
+_BAD_NAME_AC = _build_automaton(_BAD_NAME_KEYWORDS)
+
+
 # --- PAN misread mapping for digits/letters in digit positions ---
-_PAN_MISREAD_MAP = {
+# str.translate table: applying it to the 4-char digit slice is a single
+# C-level pass instead of a per-character dict loop
+_PAN_FIX_TABLE = str.maketrans({
     "O": "0", "Q": "0", "D": "0",
     "I": "1", "L": "1", "Z": "2",
     "S": "5", "B": "8", "G": "6",
     "T": "7",
-}
+})
 
 
 def _normalize_token(s: str) -> str:
-    return re.sub(r"[^a-z0-9]", "", s.lower())
+    return _NONALNUM_LOWER_RE.sub("", s.lower())
 
 
 def _is_header_text(text: str) -> bool:
     if not text:
         return False
-    tl = text.lower()
-    for pat in HEADER_PATTERNS:
-        if pat in tl:
-            return True
+    for _ in _HEADER_AC.iter(text.lower()):
+        return True
     return False
 
 
@@ -131,8 +193,16 @@ def _looks_like_name(text: str) -> bool:
     if not text:
         return False
 
+    # Cheap rejects first: most OCR segments carry digits (numbers, dates,
+    # VIDs) or are single words, so they never pay for the substitution and
+    # automaton scans below
+    if any(ch.isdigit() for ch in text):
+        return False
+    if text.count(" ") + 1 < 2:
+        return False
+
     # Keep only letters and spaces for token decisions
-    alpha_only = re.sub(r"[^A-Za-z\s]", " ", text).strip()
+    alpha_only = _NONALPHA_SPACE_RE.sub(" ", text).strip()
     if not alpha_only:
         return False
 
@@ -143,13 +213,7 @@ def _looks_like_name(text: str) -> bool:
         return False
 
     # Reject if contains bad keywords
-    for bad in _BAD_NAME_KEYWORDS:
-        if bad in tl:
-            return False
-
-    # Reject if there are digits in original text (names shouldn't contain digits)
-    digit_count = sum(ch.isdigit() for ch in text)
-    if digit_count > 0:
+    for _ in _BAD_NAME_AC.iter(tl):
         return False
 
     # Token rules: require 2..5 tokens, each token length >=2 generally
@@ -184,7 +248,7 @@ def _attempt_pan_from_compact(compact: str) -> Optional[str]:
     compact = compact.upper()
 
     # Strict match
-    m = re.search(r"[A-Z]{5}[0-9]{4}[A-Z]", compact)
+    m = _PAN_STRICT_RE.search(compact)
     if m:
         return m.group(0)
 
@@ -193,13 +257,8 @@ def _attempt_pan_from_compact(compact: str) -> Optional[str]:
         seg = compact[i : i + 10]
         if len(seg) < 10:
             continue
-        seg_list = list(seg)
-        for pos in range(5, 9):
-            ch = seg_list[pos]
-            if ch.isalpha() and ch in _PAN_MISREAD_MAP:
-                seg_list[pos] = _PAN_MISREAD_MAP[ch]
-        candidate = "".join(seg_list)
-        if re.match(r"[A-Z]{5}[0-9]{4}[A-Z]", candidate):
+        candidate = seg[:5] + seg[5:9].translate(_PAN_FIX_TABLE) + seg[9]
+        if _PAN_STRICT_RE.match(candidate):
             return candidate
     return None
 
@@ -228,12 +287,12 @@ def extract_pan_and_name_from_image(image_path: str) -> Dict:
     quality_score = _avg_confidences([c for _, c in segments]) if segments else 0.0
 
     # document number (PAN)
-    pan = _attempt_pan_from_compact(re.sub(r"[^A-Za-z0-9]", "", combined_text).upper())
+    pan = _attempt_pan_from_compact(_NONALNUM_RE.sub("", combined_text).upper())
 
     # find pan segment index
     pan_index = -1
     for i, (t, _) in enumerate(segments):
-        compact = re.sub(r"[^A-Za-z0-9]", "", t).upper()
+        compact = _NONALNUM_RE.sub("", t).upper()
         if _attempt_pan_from_compact(compact):
             pan_index = i
             break
@@ -293,12 +352,12 @@ def extract_aadhaar_and_name_from_image(image_path: str) -> Dict:
     quality_score = _avg_confidences([c for _, c in segments]) if segments else 0.0
 
     # Aadhaar number: look for grouped 4-4-4 or contiguous 12 digits
-    m = re.search(r"(\d{4}\s*\d{4}\s*\d{4})", combined_text)
+    m = _AADHAAR_GROUPED_RE.search(combined_text)
     aadhaar = None
     if m:
-        aadhaar = re.sub(r"\D", "", m.group(1))
+        aadhaar = "".join(ch for ch in m.group(1) if ch.isdigit())
     else:
-        m2 = re.search(r"(\d{12})", combined_text)
+        m2 = _AADHAAR_FLAT_RE.search(combined_text)
         if m2:
             aadhaar = m2.group(1)
 
@@ -335,16 +394,24 @@ def extract_aadhaar_and_name_from_image(image_path: str) -> Dict:
 # --- Name normalization & similarity helpers used by routes_kyc_session.py ---
 
 
-def normalize_name_for_match(name: Optional[str]) -> str:
-    if not name:
-        return ""
+@lru_cache(maxsize=4096)
+def _normalize_name_cached(name: str) -> str:
     s = name.lower()
-    s = re.sub(r"[^a-z\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _NONALPHA_LOWER_SPACE_RE.sub(" ", s)
+    s = _WS_RE.sub(" ", s).strip()
     parts = [p for p in s.split() if p and p not in _HONORIFICS]
     return " ".join(parts)
 
 
+def normalize_name_for_match(name: Optional[str]) -> str:
+    # Pure function of its input; the same stored customer name gets
+    # normalized on every retry and admin view, so memoize. None/empty is
+    # handled before the cache to keep its keys hashable strings.
+    if not name:
+        return ""
+    return _normalize_name_cached(name)
+
+
 def _token_overlap(a_tokens: List[str], b_tokens: List[str]) -> float:
     if not a_tokens or not b_tokens:
         return 0.0
@@ -355,9 +422,12 @@ def _token_overlap(a_tokens: List[str], b_tokens: List[str]) -> float:
     return len(common) / denom if denom > 0 else 0.0
 
 
+@lru_cache(maxsize=4096)
 def name_similarity_enhanced(a: Optional[str], b: Optional[str]) -> Tuple[float, float, float]:
     """
     Returns (full_sim, token_sim, combined) where combined is weighted mix.
+    Memoized: retries re-compare the same stored name against the same
+    OCR output, so repeat pairs are free.
     """
     a_norm = normalize_name_for_match(a)
     b_norm = normalize_name_for_match(b)
@@ -365,7 +435,9 @@ def name_similarity_enhanced(a: Optional[str], b: Optional[str]) -> Tuple[float,
     if not a_norm or not b_norm:
         return 0.0, 0.0, 0.0
 
-    full_sim = SequenceMatcher(None, a_norm, b_norm).ratio()
+    # rapidfuzz's C++ Indel ratio; same 0..1 scale as the old
+    # difflib.SequenceMatcher but without per-call Python overhead
+    full_sim = fuzz.ratio(a_norm, b_norm) / 100.0
     a_tokens = a_norm.split()
     b_tokens = b_norm.split()
     token_sim = _token_overlap(a_tokens, b_tokens)
@@ -1,47 +1,69 @@
+import hashlib
 import os
+from functools import lru_cache
 from pathlib import Path
 from uuid import UUID
+
+import aiofiles
 from fastapi import UploadFile
 
 UPLOAD_ROOT = Path("uploads/documents")
 
+# 1 MiB read buffer for streaming uploads to disk
+_CHUNK_SIZE = 1 << 20
+
+
+@lru_cache(maxsize=4096)
+def _ensured_dir(path: str) -> str:
+    """
+    mkdir once per process per directory. A session uploads its document
+    and selfie back to back, so the repeat makedirs calls were pure
+    stat/mkdir syscall overhead; the LRU bounds the memo.
+    """
+    os.makedirs(path, exist_ok=True)
+    return path
+
 
 def ensure_session_folder(session_id: UUID) -> str:
     """
     Create folder for storing document images for a session.
     """
-    folder = os.path.join(UPLOAD_ROOT, str(session_id))
-    os.makedirs(folder, exist_ok=True)
-    return folder
+    return _ensured_dir(os.path.join(UPLOAD_ROOT, str(session_id)))
 
 
-def save_uploaded_file(session_id: UUID, file) -> str:
+async def save_uploaded_file_async(session_id: UUID, file: UploadFile) -> tuple[str, str]:
     """
-    Saves uploaded file in local storage. Returns relative path.
+    Stream an uploaded document to disk in chunks without blocking the
+    event loop, hashing the content in the same pass.
+    Returns (relative path, sha256 hex digest).
     """
     folder = ensure_session_folder(session_id)
+    file_path = os.path.join(folder, file.filename)
 
-    filename = file.filename
-    file_path = os.path.join(folder, filename)
+    hasher = hashlib.sha256()
+    # buffering=0 writes each 1 MiB chunk straight through instead of
+    # copying it into Python's buffered layer first
+    async with aiofiles.open(file_path, "wb", buffering=0) as out:
+        while chunk := await file.read(_CHUNK_SIZE):
+            await out.write(chunk)
+            hasher.update(chunk)
 
-    # Save the file to disk
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+    return file_path, hasher.hexdigest()
 
-    return file_path
 
-def save_selfie_file(session_id: UUID, file: UploadFile) -> str:
+async def save_selfie_file_async(session_id: UUID, file: UploadFile) -> str:
     """
-    Save a selfie image under: uploads/selfies/<session_id>/<filename>
+    Stream a selfie image to uploads/selfies/<session_id>/<filename> in
+    chunks without reading the whole upload into memory.
     Returns relative path as string.
     """
-    session_dir = UPLOAD_ROOT / "selfies" / str(session_id)
-    session_dir.mkdir(parents=True, exist_ok=True)
+    session_dir = Path(_ensured_dir(str(UPLOAD_ROOT / "selfies" / str(session_id))))
 
     file_path = session_dir / file.filename
 
-    with file_path.open("wb") as buffer:
-        buffer.write(file.file.read())
+    async with aiofiles.open(file_path, "wb", buffering=0) as out:
+        while chunk := await file.read(_CHUNK_SIZE):
+            await out.write(chunk)
 
     # Store relative path, e.g. "uploads/selfies/<session>/file.jpg"
     return str(file_path)
\ No newline at end of file
@@ -1,10 +1,52 @@
+from typing import Any, Callable, Iterable
+
 import redis
 from rq import Queue
+from rq.job import Job
 
 from app.core.config import settings
 
-redis_conn = redis.Redis.from_url(settings.REDIS_URL)
+# One explicit pool shared by every consumer (RQ queue, OCR cache, selfie
+# FIFO) instead of an implicit pool per client. REDIS_URL may be a
+# unix:// socket when Redis is colocated — loopback TCP pays the full
+# TCP stack per tiny command; keepalive only applies to TCP transports.
+_pool_kwargs: dict = {"max_connections": 50}
+if not settings.REDIS_URL.startswith("unix"):
+    _pool_kwargs["socket_keepalive"] = True
+
+redis_pool = redis.ConnectionPool.from_url(settings.REDIS_URL, **_pool_kwargs)
+redis_conn = redis.Redis(connection_pool=redis_pool)
 
 # Single queue for document validation for now
 document_queue = Queue("document_validation", connection=redis_conn)
-selfie_queue = Queue("selfie_validation", connection=redis_conn)
+
+# Selfie validation is fire-and-forget, so it skips RQ entirely: one
+# RPUSH per job instead of RQ's ~5 metadata writes. Document jobs stay on
+# RQ for its retry/monitoring machinery.
+SELFIE_FIFO_KEY = "selfie_fifo"
+
+
+def enqueue_selfie(session_id) -> None:
+    """Push a session id onto the plain-list selfie queue."""
+    redis_conn.rpush(SELFIE_FIFO_KEY, str(session_id))
+
+
+def enqueue_many(
+    queue: Queue,
+    jobs: Iterable[tuple[Callable | str, tuple, dict[str, Any]]],
+) -> list[Job]:
+    """
+    Enqueue several jobs on `queue` through one Redis pipeline.
+
+    Each entry is (func, args, kwargs). All writes go out in a single
+    round trip instead of one per job — matters for bulk admin
+    reprocessing, where per-job RTT dominates enqueue time.
+    """
+    enqueued: list[Job] = []
+    with redis_conn.pipeline(transaction=False) as pipe:
+        for func, args, kwargs in jobs:
+            enqueued.append(
+                queue.enqueue_call(func=func, args=args, kwargs=kwargs, pipeline=pipe)
+            )
+        pipe.execute()
+    return enqueued
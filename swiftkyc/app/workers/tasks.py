@@ -1,59 +1,267 @@
 import asyncio
+import json
+import logging
+import re
+import threading
 from uuid import UUID
-from sqlalchemy import select
+
+import numpy as np
+from sqlalchemy import bindparam, lambda_stmt, select
 
 from app.db.session import async_session_maker
-from app.models.kyc_document import KycDocument
+from app.models.kyc_document import KycDocument, DocumentType
 from app.models.kyc_session import KycSession, KycStep, KycStatus
 from app.models.customer import Customer
 from app.services.face_validation import assess_selfie_match
+from app.utils.ocr import (
+    extract_pan_and_name_from_image,
+    extract_aadhaar_and_name_from_image,
+    name_similarity_enhanced,
+    normalize_name_for_match,
+)
+from app.workers.connection import redis_conn
+
+logger = logging.getLogger(__name__)
+
+# OCR results keyed by file hash live this long; the version prefix in the
+# key handles invalidation when the OCR pipeline changes
+OCR_CACHE_TTL = 7 * 86400
+
+# Document face embeddings are reused across the up-to-3 selfie retries,
+# so an hour of lifetime is plenty
+DOC_EMBEDDING_TTL = 3600
+
+NAME_SIM_THRESHOLD = 0.50
+TOKEN_HIGH_ACCEPT = 0.90
+
+_WS_RE = re.compile(r"\s+")
+_NONDIGIT_RE = re.compile(r"\D")
+
+# lambda_stmt keeps one compiled form of the latest-document SELECT across
+# jobs; only the sid bind changes per execution
+_LATEST_DOC_STMT = lambda_stmt(
+    lambda: select(KycDocument)
+    .where(KycDocument.session_id == bindparam("sid"))
+    .order_by(KycDocument.created_at.desc())
+    .limit(1)
+)
 
 
 # ---------------------------------------------------------
-# Helper to run async functions safely inside RQ 
+# Helper to run async functions safely inside RQ
 # ---------------------------------------------------------
+_worker_loop: asyncio.AbstractEventLoop | None = None
+_worker_loop_lock = threading.Lock()
+
+
+def _get_worker_loop() -> asyncio.AbstractEventLoop:
+    global _worker_loop
+    with _worker_loop_lock:
+        if _worker_loop is None or _worker_loop.is_closed():
+            _worker_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_worker_loop.run_forever,
+                name="worker-event-loop",
+                daemon=True,
+            ).start()
+    return _worker_loop
+
+
 def run_async(coro):
     """
-    RQ workers run in a non-async thread.
-    We must carefully manage event loops.
-    """
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    Run a coroutine on the process-wide worker event loop and wait for it.
 
-    if loop.is_running():
-        return asyncio.ensure_future(coro)
-    else:
-        return loop.run_until_complete(coro)
+    One persistent loop (lazily started in a daemon thread) serves every
+    job, whichever worker thread submits it. asyncpg connections are bound
+    to the loop they were created on, so the old loop-per-call approach
+    both leaked loops and forced the engine pool to reconnect per job.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_worker_loop()).result()
 
 
 # ---------------------------------------------------------
-# DOCUMENT VALIDATION JOB  (DISABLED — API Now Does OCR)
+# DOCUMENT VALIDATION JOB
 # ---------------------------------------------------------
-def validate_document_job(document_id: str):
+def validate_document_job(session_id: str, saved_path: str | None = None):
+    """Entry from RQ — OCR + number/name match for the latest document."""
+    return run_async(_validate_document_job_async(UUID(session_id), saved_path))
+
+
+def _run_document_ocr(doc: KycDocument, image_path: str) -> dict | None:
     """
-    This job is intentionally disabled because:
-    - OCR & document validation now happen inside the API endpoint.
-    - Worker MUST NOT override doc.is_valid or session.current_step.
-    We keep this function only for backward compatibility with RQ queues.
+    OCR the document image, short-circuiting through the Redis cache when
+    the same bytes were seen before. Returns None on OCR failure.
     """
-    return run_async(_noop_document_job_async(UUID(document_id)))
+    cache_key = (
+        f"ocr:v1:{doc.doc_type.value}:{doc.storage_sha256}"
+        if doc.storage_sha256
+        else None
+    )
 
+    if cache_key:
+        try:
+            cached = redis_conn.get(cache_key)
+            if cached:
+                return json.loads(cached)
+        except Exception:
+            logger.warning("OCR cache lookup failed for document %s", doc.id)
 
-async def _noop_document_job_async(document_id: UUID):
+    try:
+        if doc.doc_type == DocumentType.PAN:
+            ocr = extract_pan_and_name_from_image(image_path)
+        elif doc.doc_type == DocumentType.AADHAAR:
+            ocr = extract_aadhaar_and_name_from_image(image_path)
+        else:
+            # Unsupported doc types shouldn't reach here for OCR
+            # but provide a safe fallback: read raw text only
+            try:
+                from app.utils.ocr import _easyocr_read  # type: ignore
+                raw_text, _ = _easyocr_read(image_path)
+                ocr = {"document_number": None, "name": None, "raw_text": raw_text, "quality_score": 0.0}
+            except Exception:
+                ocr = {"document_number": None, "name": None, "raw_text": "", "quality_score": 0.0}
+    except Exception as e:
+        logger.exception("OCR failure for document %s: %s", doc.id, e)
+        return None
+
+    if cache_key:
+        try:
+            redis_conn.set(cache_key, json.dumps(ocr), ex=OCR_CACHE_TTL)
+        except Exception:
+            logger.warning("OCR cache write failed for document %s", doc.id)
+
+    return ocr
+
+
+async def _validate_document_job_async(session_id: UUID, saved_path: str | None = None):
     """
-    Previously used to validate documents.
-    Now does nothing except ensuring the document exists,
-    so the RQ queue does not break if it's still enqueued.
+    Runs the OCR + matching pipeline that used to live inline in the
+    validate-document endpoint. On success the session advances to SELFIE;
+    otherwise it stays at SCAN_DOC with an explicit failure_reason that
+    the polling frontend surfaces to the user.
     """
+
     async with async_session_maker() as db:
-        # Load document just to verify existence
-        result = await db.execute(select(KycDocument).where(KycDocument.id == document_id))
-        doc = result.scalar_one_or_none()
-        # We do not modify doc or session anymore
-        return  # NO-OP
+
+        # Load session (db.get uses the cached PK SELECT and identity map)
+        session = await db.get(KycSession, session_id)
+        if not session:
+            return
+
+        # Only act while the session is still waiting on a scan
+        if session.current_step != KycStep.SCAN_DOC:
+            return
+
+        # Load latest document (index seek on ix_kyc_documents_session_created)
+        result = await db.execute(_LATEST_DOC_STMT, {"sid": session.id})
+        doc = result.scalars().first()
+        if not doc:
+            session.failure_reason = "DOCUMENT_NOT_FOUND"
+            await db.commit()
+            return
+
+        image_path = saved_path or doc.storage_url
+
+        # OCR (cached by content hash) — seconds of CPU-bound inference,
+        # so push it off the shared worker loop like the face match
+        ocr = await asyncio.to_thread(_run_document_ocr, doc, image_path)
+        if ocr is None:
+            doc.is_valid = False
+            doc.quality_score = None
+            session.failure_reason = "OCR_ERROR"
+            session.current_step = KycStep.SCAN_DOC
+            await db.commit()
+            return
+
+        # Save OCR quality score if available
+        try:
+            doc.quality_score = float(ocr.get("quality_score")) if ocr.get("quality_score") is not None else None
+        except Exception:
+            doc.quality_score = None
+
+        # Compare OCR number with the entered number
+        entered_number = (doc.doc_number or "").strip()
+        ocr_number = (ocr.get("document_number") or "").strip() if ocr.get("document_number") else ""
+
+        number_match = False
+        detailed_reasons: list[str] = []
+
+        if entered_number and ocr_number:
+            if doc.doc_type == DocumentType.PAN:
+                norm_entered = _WS_RE.sub("", entered_number).upper()
+                norm_ocr = _WS_RE.sub("", ocr_number).upper()
+                number_match = (norm_entered == norm_ocr)
+                if not number_match:
+                    detailed_reasons.append(f"OCR_NUMBER_MISMATCH_PAN entered='{norm_entered}' ocr='{norm_ocr}'")
+            elif doc.doc_type == DocumentType.AADHAAR:
+                norm_entered = _NONDIGIT_RE.sub("", entered_number)
+                norm_ocr = _NONDIGIT_RE.sub("", ocr_number)
+                if len(norm_entered) == 12 and len(norm_ocr) == 12 and norm_entered == norm_ocr:
+                    number_match = True
+                else:
+                    # fallback accept last-4 match (less strict)
+                    if len(norm_entered) >= 4 and len(norm_ocr) >= 4 and norm_entered[-4:] == norm_ocr[-4:]:
+                        number_match = True
+                    else:
+                        number_match = False
+                if not number_match:
+                    detailed_reasons.append(f"OCR_NUMBER_MISMATCH_AADHAAR entered='{norm_entered}' ocr='{norm_ocr}'")
+            else:
+                number_match = entered_number == ocr_number
+                if not number_match:
+                    detailed_reasons.append(f"OCR_NUMBER_MISMATCH entered='{entered_number}' ocr='{ocr_number}'")
+        else:
+            detailed_reasons.append(f"OCR_NUMBER_MISSING entered_present={'yes' if entered_number else 'no'} ocr_present={'yes' if ocr_number else 'no'}")
+            number_match = False
+
+        # Compare OCR name with stored customer name using enhanced matcher
+        customer = await db.get(Customer, session.customer_id)
+        entered_name_raw = (customer.name if customer else "") or ""
+        ocr_name_raw = (ocr.get("name") or "") or ""
+
+        # normalize once; an exact match (clean OCR) or an empty side
+        # skips the similarity computation entirely
+        entered_name_norm = normalize_name_for_match(entered_name_raw)
+        ocr_name_norm = normalize_name_for_match(ocr_name_raw)
+
+        name_match = False
+        if entered_name_norm and ocr_name_norm:
+            if entered_name_norm == ocr_name_norm:
+                full_sim = token_sim = combined_sim = 1.0
+                name_match = True
+            else:
+                full_sim, token_sim, combined_sim = name_similarity_enhanced(entered_name_raw, ocr_name_raw)
+                name_match = (combined_sim >= NAME_SIM_THRESHOLD) or (token_sim >= TOKEN_HIGH_ACCEPT)
+        else:
+            full_sim = token_sim = combined_sim = 0.0
+            if not entered_name_norm:
+                detailed_reasons.append("OCR_NAME_MISSING_ENTERED_NAME_EMPTY")
+            if not ocr_name_norm:
+                detailed_reasons.append("OCR_NAME_MISSING_OCR_NAME_EMPTY")
+            name_match = False
+
+        if not name_match and entered_name_norm and ocr_name_norm:
+            detailed_reasons.append(
+                "OCR_NAME_MISMATCH "
+                f"entered='{entered_name_norm}' "
+                f"ocr='{ocr_name_norm}' "
+                f"full_sim={full_sim:.2f} token_sim={token_sim:.2f} combined={combined_sim:.2f}"
+            )
+
+        # Final decision — accept only if both match
+        if number_match and name_match:
+            doc.is_valid = True
+            session.current_step = KycStep.SELFIE
+            session.failure_reason = None
+        else:
+            doc.is_valid = False
+            session.current_step = KycStep.SCAN_DOC
+            if ocr.get("raw_text"):
+                raw_len = len(str(ocr.get("raw_text")))
+                detailed_reasons.append(f"OCR_RAW_LEN={raw_len}")
+            session.failure_reason = ";".join(detailed_reasons) if detailed_reasons else "OCR_MISMATCH"
+
+        await db.commit()
 
 
 # ---------------------------------------------------------
@@ -75,54 +283,80 @@ async def _validate_selfie_job_async(session_id: UUID):
     If any fail → DO NOT APPROVE. DO NOT FACE MATCH.
     """
 
-    async with async_session_maker() as db:
+    async with async_session_maker() as db, db.begin():
 
-        # Load session
-        result = await db.execute(select(KycSession).where(KycSession.id == session_id))
-        session = result.scalar_one_or_none()
+        # Session + latest document in one round trip via the
+        # current_document_id pointer. Lock the session row (blocking —
+        # NOT skip_locked: the FIFO has no redelivery, so skipping on a
+        # transient lock such as an admin approve/reject would silently
+        # drop the job). A holder finishes in milliseconds; all mutations
+        # below commit atomically when the begin() block exits.
+        row = (
+            await db.execute(
+                select(KycSession, KycDocument)
+                .outerjoin(KycDocument, KycDocument.id == KycSession.current_document_id)
+                .where(KycSession.id == session_id)
+                .with_for_update(of=KycSession)
+            )
+        ).first()
+        session, doc = row if row else (None, None)
         if not session:
+            # Unknown session id
             return
 
-        # Ensure correct step
+        # Ensure correct step. A duplicate delivery that blocked on the
+        # lock lands here after the first run advanced the session — make
+        # it a pure no-op rather than scribbling a failure_reason on a
+        # session that may already be APPROVED.
         if session.current_step != KycStep.KYC_CHECK:
-            session.failure_reason = "INVALID_STATE_FOR_SELFIE_VALIDATION"
-            await db.commit()
             return
 
         if not session.selfie_url:
             session.failure_reason = "SELFIE_NOT_FOUND"
             session.current_step = KycStep.SELFIE
-            await db.commit()
             return
 
-        # Load latest document
-        result = await db.execute(
-            select(KycDocument)
-            .where(KycDocument.session_id == session.id)
-            .order_by(KycDocument.created_at.desc())
-        )
-        doc = result.scalar_one_or_none()
-
         if not doc:
             session.failure_reason = "DOCUMENT_NOT_FOUND"
             session.current_step = KycStep.SELFIE
-            await db.commit()
             return
 
         # ---- ENFORCED GUARD: Document must be valid ----
         if doc.is_valid is not True:
             session.failure_reason = "DOC_NOT_VALID"
             session.current_step = KycStep.SELFIE
-            await db.commit()
             return
         # ------------------------------------------------
 
         # FACE MATCH NOW SAFE TO RUN
-        match = assess_selfie_match(
+        # Reuse the document's face embedding across retries when cached;
+        # computing it is the dominant cost of a match
+        emb_key = f"docemb:{doc.id}"
+        cached_emb = None
+        try:
+            raw = redis_conn.get(emb_key)
+            if raw:
+                cached_emb = np.frombuffer(raw, dtype=np.float32)
+        except Exception:
+            logger.warning("Doc embedding cache lookup failed for document %s", doc.id)
+
+        # CPU-bound (OpenCV decode + matching) — run it on a thread so the
+        # shared worker event loop stays free for other jobs' DB I/O
+        match = await asyncio.to_thread(
+            assess_selfie_match,
             doc_image_path=doc.storage_url,
             selfie_image_path=session.selfie_url,
+            doc_embedding=cached_emb,
         )
 
+        if cached_emb is None and match.doc_embedding is not None:
+            try:
+                redis_conn.setex(
+                    emb_key, DOC_EMBEDDING_TTL, match.doc_embedding.tobytes()
+                )
+            except Exception:
+                logger.warning("Doc embedding cache write failed for document %s", doc.id)
+
         session.face_match_score = match.score
 
         if not match.is_match:
@@ -146,4 +380,3 @@ async def _validate_selfie_job_async(session_id: UUID):
             session.failure_reason = None
             session.current_step = KycStep.COMPLETE
 
-        await db.commit()
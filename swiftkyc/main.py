@@ -1,6 +1,19 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with a long-lived Cache-Control header on every asset."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        # Assets change only on deploy; ETag/Last-Modified (set by
+        # StaticFiles) still let a hard refresh revalidate with a 304
+        response.headers["Cache-Control"] = "public, max-age=86400"
+        return response
+
 
 from app.api.v1.routes_health import router as health_router
 from app.api.v1.routes_kyc_session import router as kyc_session_router
@@ -12,10 +25,16 @@ app = FastAPI(
     title="SwiftKyc Backend",
     version="1.0.0",
     description="Digital KYC backend for SwiftKyc",
+    # orjson serializes UUID/datetime natively at C speed — noticeable on
+    # the admin list endpoints
+    default_response_class=ORJSONResponse,
 )
 
+# Compress JSON and static text responses above 1 KiB
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Serve static files (JS, CSS, images)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="app/static"), name="static")
 
 API_PREFIX = "/api/v1"
 
@@ -25,9 +44,10 @@ app.include_router(kyc_session_router, prefix=API_PREFIX)
 app.include_router(admin_kyc_router, prefix=API_PREFIX)
 
 
-# Serve homepage (index.html) at root
-@app.get("/", response_class=HTMLResponse)
+# Serve homepage (index.html) at root. FileResponse streams from a worker
+# thread (sendfile where available) and sets ETag/Last-Modified so browsers
+# revalidate with 304s instead of refetching.
+@app.get("/", response_class=FileResponse)
 async def root():
-    with open("app/static/index.html", encoding="utf-8") as f:
-        return f.read()
+    return FileResponse("app/static/index.html", media_type="text/html")
 
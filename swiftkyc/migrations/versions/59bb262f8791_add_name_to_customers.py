@@ -14,25 +14,39 @@ down_revision = "39b6f913defe"
 branch_labels = None
 depends_on = None
 
+# Rows per backfill batch; keeps each UPDATE's lock footprint small
+_BATCH_SIZE = 10_000
+
 
 def upgrade():
-    # Add column with default='' and NOT NULL
+    # 1. Add the column nullable, with no default — metadata-only on
+    #    PG >= 11, so the ACCESS EXCLUSIVE lock is held for milliseconds
     op.add_column(
         "customers",
-        sa.Column(
-            "name",
-            sa.String(length=200),
-            nullable=False,
-            server_default="",
-        ),
+        sa.Column("name", sa.String(length=200), nullable=True),
     )
 
-    # Important: remove the server default *after* existing rows are filled
-    op.alter_column(
-        "customers",
-        "name",
-        server_default=None
-    )
+    # 2. Backfill in bounded batches (row locks only, throttleable)
+    conn = op.get_bind()
+    while True:
+        result = conn.execute(
+            sa.text(
+                """
+                UPDATE customers SET name = ''
+                WHERE id IN (
+                    SELECT id FROM customers
+                    WHERE name IS NULL
+                    LIMIT :batch
+                )
+                """
+            ),
+            {"batch": _BATCH_SIZE},
+        )
+        if result.rowcount < _BATCH_SIZE:
+            break
+
+    # 3. One short lock to flip the constraint
+    op.alter_column("customers", "name", nullable=False)
 
 
 def downgrade():
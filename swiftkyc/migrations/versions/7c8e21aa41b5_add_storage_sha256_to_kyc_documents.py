@@ -0,0 +1,26 @@
+"""add storage_sha256 column to kyc_documents
+
+Revision ID: add_doc_sha256_20260831
+Revises: add_customer_name_20251210
+Create Date: 2026-08-31 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "add_doc_sha256_20260831"
+down_revision = "add_customer_name_20251210"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "kyc_documents",
+        sa.Column("storage_sha256", sa.String(length=64), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("kyc_documents", "storage_sha256")
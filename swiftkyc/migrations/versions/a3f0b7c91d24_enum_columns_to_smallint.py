@@ -0,0 +1,85 @@
+"""convert enum columns to smallint codes
+
+Revision ID: enum_cols_to_smallint_20260831
+Revises: add_current_doc_ptr_20260831
+Create Date: 2026-08-31 00:00:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "enum_cols_to_smallint_20260831"
+down_revision = "add_current_doc_ptr_20260831"
+branch_labels = None
+depends_on = None
+
+# Codes mirror declaration order of the Python enums (see app/db/types.py);
+# only ever append new members.
+_STATUS_CODES = [("IN_PROGRESS", 0), ("APPROVED", 1), ("REJECTED", 2), ("ABANDONED", 3)]
+_STEP_CODES = [
+    ("SELECT_DOC", 0),
+    ("SCAN_DOC", 1),
+    ("VALIDATE_DOC", 2),
+    ("SELFIE", 3),
+    ("KYC_CHECK", 4),
+    ("COMPLETE", 5),
+]
+_DOC_TYPE_CODES = [("AADHAAR", 0), ("PAN", 1), ("PASSPORT", 2), ("VOTER_ID", 3)]
+
+
+def _label_to_code_cases(column: str, codes) -> str:
+    whens = " ".join(f"WHEN '{label}' THEN {code}" for label, code in codes)
+    return f"CASE {column}::text {whens} END"
+
+
+def _code_to_label_cases(column: str, codes, pg_type: str) -> str:
+    whens = " ".join(f"WHEN {code} THEN '{label}'" for label, code in codes)
+    return f"(CASE {column} {whens} END)::{pg_type}"
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE kyc_sessions ALTER COLUMN status TYPE smallint USING "
+        + _label_to_code_cases("status", _STATUS_CODES)
+    )
+    op.execute(
+        "ALTER TABLE kyc_sessions ALTER COLUMN current_step TYPE smallint USING "
+        + _label_to_code_cases("current_step", _STEP_CODES)
+    )
+    op.execute(
+        "ALTER TABLE kyc_documents ALTER COLUMN doc_type TYPE smallint USING "
+        + _label_to_code_cases("doc_type", _DOC_TYPE_CODES)
+    )
+
+    # The Postgres enum types have no remaining references
+    op.execute("DROP TYPE kyc_status")
+    op.execute("DROP TYPE kyc_step")
+    op.execute("DROP TYPE document_type_enum")
+
+
+def downgrade():
+    op.execute(
+        "CREATE TYPE kyc_status AS ENUM "
+        "('IN_PROGRESS', 'APPROVED', 'REJECTED', 'ABANDONED')"
+    )
+    op.execute(
+        "CREATE TYPE kyc_step AS ENUM "
+        "('SELECT_DOC', 'SCAN_DOC', 'VALIDATE_DOC', 'SELFIE', 'KYC_CHECK', 'COMPLETE')"
+    )
+    op.execute(
+        "CREATE TYPE document_type_enum AS ENUM "
+        "('AADHAAR', 'PAN', 'PASSPORT', 'VOTER_ID')"
+    )
+
+    op.execute(
+        "ALTER TABLE kyc_sessions ALTER COLUMN status TYPE kyc_status USING "
+        + _code_to_label_cases("status", _STATUS_CODES, "kyc_status")
+    )
+    op.execute(
+        "ALTER TABLE kyc_sessions ALTER COLUMN current_step TYPE kyc_step USING "
+        + _code_to_label_cases("current_step", _STEP_CODES, "kyc_step")
+    )
+    op.execute(
+        "ALTER TABLE kyc_documents ALTER COLUMN doc_type TYPE document_type_enum USING "
+        + _code_to_label_cases("doc_type", _DOC_TYPE_CODES, "document_type_enum")
+    )
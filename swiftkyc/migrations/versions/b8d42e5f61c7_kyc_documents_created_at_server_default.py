@@ -0,0 +1,31 @@
+"""server-side default for kyc_documents.created_at
+
+Revision ID: doc_created_at_server_default_20260831
+Revises: enum_cols_to_smallint_20260831
+Create Date: 2026-08-31 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "doc_created_at_server_default_20260831"
+down_revision = "enum_cols_to_smallint_20260831"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column(
+        "kyc_documents",
+        "created_at",
+        server_default=sa.func.now(),
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "kyc_documents",
+        "created_at",
+        server_default=None,
+    )
@@ -0,0 +1,37 @@
+"""add indexes backing the admin session list filters
+
+Revision ID: add_session_list_indexes_20260831
+Revises: add_doc_sha256_20260831
+Create Date: 2026-08-31 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "add_session_list_indexes_20260831"
+down_revision = "add_doc_sha256_20260831"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expression index for the same-day filter. AT TIME ZONE 'UTC' makes the
+    # expression immutable so Postgres accepts it in an index.
+    op.create_index(
+        "ix_kyc_sessions_created_day",
+        "kyc_sessions",
+        [sa.text("date_trunc('day', created_at AT TIME ZONE 'UTC')")],
+    )
+
+    # Backs status filter + ORDER BY created_at DESC in list_sessions
+    op.create_index(
+        "ix_kyc_sessions_status_created_at",
+        "kyc_sessions",
+        ["status", sa.text("created_at DESC")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_kyc_sessions_status_created_at", table_name="kyc_sessions")
+    op.drop_index("ix_kyc_sessions_created_day", table_name="kyc_sessions")
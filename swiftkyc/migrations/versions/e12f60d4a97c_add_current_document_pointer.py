@@ -0,0 +1,58 @@
+"""add current_document_id pointer to kyc_sessions
+
+Revision ID: add_current_doc_ptr_20260831
+Revises: add_session_list_indexes_20260831
+Create Date: 2026-08-31 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "add_current_doc_ptr_20260831"
+down_revision = "add_session_list_indexes_20260831"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "kyc_sessions",
+        sa.Column("current_document_id", sa.UUID(), nullable=True),
+    )
+    op.create_foreign_key(
+        "fk_kyc_sessions_current_document_id",
+        "kyc_sessions",
+        "kyc_documents",
+        ["current_document_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+    # Backfill the pointer for existing sessions
+    op.execute(
+        """
+        UPDATE kyc_sessions s
+        SET current_document_id = (
+            SELECT d.id FROM kyc_documents d
+            WHERE d.session_id = s.id
+            ORDER BY d.created_at DESC
+            LIMIT 1
+        )
+        """
+    )
+
+    # Fallback index for any remaining latest-document-by-time lookups
+    op.create_index(
+        "ix_kyc_documents_session_created",
+        "kyc_documents",
+        ["session_id", sa.text("created_at DESC")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_kyc_documents_session_created", table_name="kyc_documents")
+    op.drop_constraint(
+        "fk_kyc_sessions_current_document_id", "kyc_sessions", type_="foreignkey"
+    )
+    op.drop_column("kyc_sessions", "current_document_id")
@@ -1,7 +1,20 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from rq import SimpleWorker, Queue, Connection
-from app.workers.connection import redis_conn
+from app.workers.connection import SELFIE_FIFO_KEY, redis_conn
+
+# app.utils.ocr and app.workers.tasks are imported inside run_worker():
+# they drag in torch + the EasyOCR models, which only the worker
+# processes need — with WORKER_CONCURRENCY > 1 the supervising parent
+# just sits in join() and must not pay that footprint.
+
+logger = logging.getLogger(__name__)
 
-listen = ["document_validation", "selfie_validation"]
+listen = ["document_validation"]
 
 
 class NoOpDeathPenalty:
@@ -17,12 +30,66 @@ class NoOpDeathPenalty:
         return False
 
 
-if __name__ == "__main__":
+class ThreadSafeWorker(SimpleWorker):
+    """Worker that skips signal-handler setup so it can run off the main thread."""
+
+    def _install_signal_handlers(self):
+        pass
+
+
+def selfie_fifo_loop():
+    """
+    Drain the plain-list selfie queue. One BLPOP per job instead of RQ's
+    per-job metadata writes; a failed job is logged and the loop moves on.
+    """
+    from app.workers.tasks import validate_selfie_job
+
+    while True:
+        try:
+            _, sid = redis_conn.blpop(SELFIE_FIFO_KEY)
+            validate_selfie_job(sid.decode())
+        except Exception:
+            logger.exception("Selfie validation job failed")
+
+
+def run_worker(worker_cls=SimpleWorker):
+    # Heavy import deferred to worker (sub)processes — see module top
+    from app.utils.ocr import warmup as ocr_warmup
+
     with Connection(redis_conn):
         # Make workers for each queue
         queues = [Queue(name, connection=redis_conn) for name in listen]
 
-        worker = SimpleWorker(queues)
+        worker = worker_cls(queues)
         worker.death_penalty_class = NoOpDeathPenalty
 
+        # Pay the OCR model init here, not on the first job
+        ocr_warmup()
+
+        # Selfie jobs come off the featureless FIFO in a side thread;
+        # document jobs keep RQ's retry/monitoring machinery
+        threading.Thread(target=selfie_fifo_loop, daemon=True).start()
+
         worker.work(with_scheduler=False)
+
+
+if __name__ == "__main__":
+    concurrency = int(os.environ.get("WORKER_CONCURRENCY", "1"))
+
+    if concurrency <= 1:
+        run_worker()
+    elif os.name == "posix":
+        # Spawn (not fork) so each child builds its own Redis connection,
+        # engine pool and OCR reader from scratch
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=run_worker) for _ in range(concurrency)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    else:
+        # Windows: threads in one process. Signal handlers only work on the
+        # main thread, hence ThreadSafeWorker.
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(run_worker, ThreadSafeWorker)